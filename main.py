@@ -1,16 +1,43 @@
 # main.py
 import yaml
-import json
+import os
+import sys
 from datetime import datetime
-from tools.serper_job_search_tool import SerperJobSearchTool
-from tools.email_sender_tool import EmailSenderTool
-from tools.html_email_formatter import HTMLEmailFormatter
-from tools.llm_sumarizer_tool import LLMSummarizerTool  # Added import
-from utils.logger import logger
+from typing import List, Dict
+from utils.digest_worker import run_workers
+from utils.job_queue import JobQueue
+from utils.logger import configure_logging, logger
+
+
+def load_profiles(config: Dict) -> List[Dict]:
+    """Build the list of alert profiles, falling back to the top-level config as a single profile"""
+    defaults = {
+        'keywords': config.get('keywords', []),
+        'locations': config.get('locations', []),
+        'max_results': config.get('max_results', 10),
+        'recipient_name': config.get('recipient_name', 'Job Seeker'),
+    }
+
+    profiles = config.get('profiles')
+    if not profiles:
+        return [{'name': 'default', **defaults}]
+
+    names = set()
+    result = []
+    for profile in profiles:
+        merged = {**defaults, **profile}
+        if not merged.get('name'):
+            raise ValueError("Every profile in config/job_alert.yaml needs a 'name'")
+        if merged['name'] in names:
+            raise ValueError(f"Duplicate profile name in config/job_alert.yaml: {merged['name']}")
+        names.add(merged['name'])
+        result.append(merged)
+    return result
+
 
 def main():
     logger.info("Starting Job Alert System")
-    
+
     try:
         # 1. Load config
         logger.info("Loading configuration files...")
@@ -18,68 +45,77 @@ def main():
             config = yaml.safe_load(f)
         logger.info("Configuration loaded successfully")
 
+        log_config = config.get('logging') or {}
+        logging_settings = {
+            'level': log_config.get('level', 'INFO'),
+            'fmt': log_config.get('format', 'text'),
+            'levels': log_config.get('levels') or {},
+        }
+        configure_logging(**logging_settings)
+
         # 1b. Load prompt templates
         with open('config/prompts.yaml', 'r') as f:
             prompts = yaml.safe_load(f)
         logger.info("Prompt templates loaded successfully")
 
-        system_message = prompts['summarizer_system_message']
-        prompt_intro = prompts['summarizer_prompt_intro']
-
-        keywords = config.get('keywords', [])
-        locations = config.get('locations', [])
-        max_results = config.get('max_results', 10)
-        recipient_name = config.get('recipient_name', 'Job Seeker')
-        
-        logger.info(f"Search parameters - Keywords: {keywords}, Locations: {locations}, Max results: {max_results}")
-
-        # 2. Search for jobs
-        logger.info("Initializing job search...")
-        serper_tool = SerperJobSearchTool()
-        job_results = serper_tool._run(keywords, locations, max_results)
-        logger.info(f"Job search completed. Found {len(job_results)} job listings")
-
-        # 3. Summarize with LLMSummarizerTool 
-        logger.info("Using LLMSummarizerTool for job summarization...")
-        llm_summarizer = LLMSummarizerTool()
-        summary = llm_summarizer._run(job_results, system_message, prompt_intro)
-        logger.info("LLM summarization completed")
-
-        # 4. Format email with modern HTML template
-        logger.info("Formatting email with HTML template...")
-        html_formatter = HTMLEmailFormatter()
-        
-        # Try to parse LLM's JSON response, fallback to simple formatting
+        prompt_settings = {
+            'system_message': prompts['summarizer_system_message'],
+            'prompt_intro': prompts['summarizer_prompt_intro'],
+        }
+
+        profiles = load_profiles(config)
+        logger.info(f"Loaded {len(profiles)} alert profile(s)")
+
+        queue_config = config.get('queue') or {}
+        queue_settings = {
+            'db_path': queue_config.get('db_path', 'data/job_queue.db'),
+            'max_attempts': queue_config.get('max_attempts', 3),
+            'lease_seconds': queue_config.get('lease_seconds', 900),
+            'retry_backoff': queue_config.get('retry_backoff', 30),
+            'poll_interval': queue_config.get('poll_interval', 1.0),
+        }
+        num_workers = queue_config.get('workers') or os.cpu_count() or 1
+        num_workers = min(num_workers, len(profiles))
+
+        # One run per day; re-running on the same day resumes where the last run stopped
+        run_id = queue_config.get('run_id') or datetime.now().strftime("%Y-%m-%d")
+
+        # 2. Queue a search task per profile (already queued profiles are left alone)
+        queue = JobQueue(
+            queue_settings['db_path'],
+            max_attempts=queue_settings['max_attempts'],
+            lease_seconds=queue_settings['lease_seconds'],
+            retry_backoff=queue_settings['retry_backoff']
+        )
         try:
-            parsed_summary = json.loads(summary)
-            html_email = html_formatter.create_enhanced_email(
-                recipient_name=recipient_name,
-                job_data=parsed_summary,
-                search_keywords=keywords,
-                search_locations=locations
-            )
-        except (json.JSONDecodeError, KeyError):
-            logger.warning("Could not parse LLM JSON response, using fallback formatting")
-            html_email = html_formatter.create_simple_email(
-                recipient_name=recipient_name,
-                job_results=job_results,
-                search_keywords=keywords,
-                search_locations=locations
-            )
-
-        # 5. Send email
-        logger.info("Preparing to send email digest...")
-        email_tool = EmailSenderTool()
-        
-        # Enhanced subject line
-        current_date = datetime.now().strftime("%B %d, %Y")
-        subject = f"🚀 Your Job Alert Digest - {len(job_results)} New Opportunities | {current_date}"
-        
-        result = email_tool._run(subject, html_email)
-        logger.info(f"Email sending result: {result}")
-        print(result)
-        
-        logger.info("Job Alert System completed successfully")
+            queue.release_stale(run_id)
+            queue.requeue_failed(run_id)
+            queued = 0
+            for profile in profiles:
+                if queue.enqueue(run_id, profile['name'], 'search', {'profile': profile, 'prompts': prompt_settings}):
+                    queued += 1
+            logger.info(f"Run {run_id}: queued {queued} new profile(s), {len(profiles) - queued} already in progress or done")
+
+            # 3. Search, summarize, render and send in parallel worker processes
+            logger.info(f"Starting {num_workers} worker process(es)...")
+            run_workers(run_id, queue_settings, logging_settings, num_workers)
+
+            # 4. Report the outcome
+            counts = queue.counts(run_id)
+            failed = queue.failed_tasks(run_id)
+        finally:
+            queue.close()
+
+        logger.info(f"Run {run_id} task status: {counts}")
+        for task in failed:
+            logger.error(f"Profile '{task['profile']}' failed at stage '{task['stage']}' after {task['attempts']} attempts: {task['error']}")
+
+        if failed:
+            logger.warning(f"Job Alert System completed with {len(failed)} failed profile(s)")
+            # Exit non-zero so schedulers can tell a partial failure from a clean run
+            sys.exit(1)
+        else:
+            logger.info("Job Alert System completed successfully")
 
     except FileNotFoundError as e:
         logger.error(f"Configuration file not found: {e}")
@@ -92,4 +128,4 @@ def main():
         raise
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
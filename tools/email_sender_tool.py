@@ -4,24 +4,42 @@ import os
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from email.charset import Charset, QP
 from dotenv import load_dotenv
-from utils.logger import logger
+from utils.logger import get_logger
 
 load_dotenv()
 
+logger = get_logger(__name__)
+
+# Quoted-printable keeps mostly-ASCII HTML close to its raw size, unlike base64
+UTF8_QP = Charset('utf-8')
+UTF8_QP.body_encoding = QP
+
+PLAINTEXT_FALLBACK = "Please view this email in an HTML-enabled client for the best experience."
+
 
 class EmailSenderTool(BaseTool):
     name: str = "Email Sender Tool"
     description: str = "Sends the job alert digest via email using SMTP."
 
-    def _run(self, subject: str, body: str) -> str:
+    def _run(self, subject: str, body: str, to_email: str = None, text_body: str = None) -> str:
+        try:
+            return self.send_email(subject, body, to_email, text_body)
+        except ValueError:
+            raise
+        except Exception as e:
+            return f"❌ Failed to send email: {e}"
+
+    def send_email(self, subject: str, body: str, to_email: str = None, text_body: str = None) -> str:
+        """Send the digest, raising on SMTP errors so callers can retry"""
         logger.info("Starting email sending process...")
         
         smtp_server = os.getenv('SMTP_SERVER')
         smtp_port = int(os.getenv('SMTP_PORT', 587))
         email_user = os.getenv('EMAIL_USER')
         email_pass = os.getenv('EMAIL_PASS')
-        to_email = os.getenv('EMAIL_TO')
+        to_email = to_email or os.getenv('EMAIL_TO')
 
         logger.info("Email configuration:")
         logger.info(f"SMTP_SERVER: {smtp_server}")
@@ -41,12 +59,17 @@ class EmailSenderTool(BaseTool):
         msg['To'] = to_email
 
         # Create both plain text and HTML versions
-        text_part = MIMEText("Please view this email in an HTML-enabled client for the best experience.", 'plain')
-        html_part = MIMEText(body, 'html')
+        text_part = MIMEText(text_body or PLAINTEXT_FALLBACK, 'plain', UTF8_QP)
+        html_part = MIMEText(body, 'html', UTF8_QP)
 
         msg.attach(text_part)
         msg.attach(html_part)
 
+        message = msg.as_string()
+        logger.info("Message size for %s: %.1f KB (HTML %.1f KB, text %.1f KB)", to_email,
+                    len(message.encode()) / 1024, len(html_part.get_payload()) / 1024,
+                    len(text_part.get_payload()) / 1024)
+
         try:
             logger.info(f"Connecting to SMTP server {smtp_server}:{smtp_port}...")
             with smtplib.SMTP(smtp_server, smtp_port) as server:
@@ -55,13 +78,12 @@ class EmailSenderTool(BaseTool):
                 logger.info("Authenticating with SMTP server...")
                 server.login(email_user, email_pass)
                 logger.info(f"Sending email to {to_email}...")
-                server.sendmail(email_user, [to_email], msg.as_string())
+                server.sendmail(email_user, [to_email], message)
             
             success_msg = f"✅ Email sent to {to_email}"
             logger.info(f"Email sent successfully to {to_email}")
             return success_msg
             
         except Exception as e:
-            error_msg = f"❌ Failed to send email: {e}"
             logger.error(f"Failed to send email: {e}")
-            return error_msg
\ No newline at end of file
+            raise
\ No newline at end of file
@@ -1,7 +1,24 @@
 # tools/html_email_formatter.py
+import re
 from typing import List, Dict
 from datetime import datetime
 
+# Job card styles, emitted once in the <head> instead of inline on every card.
+# The score badge colour and the Apply button stay inline: the colour varies
+# per job, and several mail clients restyle links unless styles are inline.
+JOB_CARD_CSS = """
+.job{background:white;border-radius:12px;padding:24px;margin-bottom:20px;box-shadow:0 2px 8px rgba(0,0,0,0.1);border-left:4px solid #4F46E5}
+.job-head{display:flex;justify-content:space-between;align-items:flex-start;margin-bottom:12px}
+.job-title{margin:0;color:#1F2937;font-size:18px;font-weight:600;line-height:1.4}
+.score{color:white;padding:4px 8px;border-radius:12px;font-size:11px;font-weight:600;margin-left:8px}
+.tag{background:#EEF2FF;color:#4F46E5;padding:4px 12px;border-radius:20px;font-size:12px;font-weight:500}
+.meta{margin:0 0 8px 0;color:#6B7280;font-size:14px}
+.meta-last{margin:0 0 16px 0;color:#6B7280;font-size:14px}
+.desc{margin:0 0 16px 0;color:#374151;font-size:14px;line-height:1.6}
+"""
+
+APPLY_BUTTON_STYLE = "display:inline-block;background:#4F46E5;color:white;text-decoration:none;padding:12px 24px;border-radius:8px;font-weight:500;font-size:14px"
+
 
 class HTMLEmailFormatter:
     """Creates modern, responsive HTML email templates for job alerts."""
@@ -15,27 +32,27 @@ class HTMLEmailFormatter:
             # *** NEW: Add relevance score badge ***
             relevance_score = job.get('relevance_score', 0)
             score_color = self._get_score_color(relevance_score)
-            score_badge = f'<span style="background: {score_color}; color: white; padding: 4px 8px; border-radius: 12px; font-size: 11px; font-weight: 600; margin-left: 8px;">Score: {relevance_score}%</span>'
+            score_badge = f'<span class="score" style="background:{score_color}">Score: {relevance_score}%</span>'
             
             jobs_html += f"""
-            <div style="background: white; border-radius: 12px; padding: 24px; margin-bottom: 20px; box-shadow: 0 2px 8px rgba(0,0,0,0.1); border-left: 4px solid #4F46E5;">
-                <div style="display: flex; justify-content: space-between; align-items: flex-start; margin-bottom: 12px;">
-                    <h3 style="margin: 0; color: #1F2937; font-size: 18px; font-weight: 600; line-height: 1.4;">
+            <div class="job">
+                <div class="job-head">
+                    <h3 class="job-title">
                         {job.get('title', 'Job Title Not Available')}
                         {score_badge}
                     </h3>
-                    {f'<span style="background: #EEF2FF; color: #4F46E5; padding: 4px 12px; border-radius: 20px; font-size: 12px; font-weight: 500;">{job.get("employment_type", "")}</span>' if job.get('employment_type') else ''}
+                    {f'<span class="tag">{job.get("employment_type", "")}</span>' if job.get('employment_type') else ''}
                 </div>
                 
-                {f'<p style="margin: 0 0 8px 0; color: #6B7280; font-size: 14px;"><strong>Company:</strong> {job.get("company", "Not specified")}</p>' if job.get('company') else ''}
-                <p style="margin: 0 0 8px 0; color: #6B7280; font-size: 14px;"><strong>Location:</strong> {job.get('location', 'Not specified')}</p>
-                {f'<p style="margin: 0 0 16px 0; color: #6B7280; font-size: 14px;"><strong>Salary:</strong> {job.get("salary", "")}</p>' if job.get('salary') else ''}
+                {f'<p class="meta"><strong>Company:</strong> {job.get("company", "Not specified")}</p>' if job.get('company') else ''}
+                <p class="meta"><strong>Location:</strong> {job.get('location', 'Not specified')}</p>
+                {f'<p class="meta-last"><strong>Salary:</strong> {job.get("salary", "")}</p>' if job.get('salary') else ''}
                 
-                <p style="margin: 0 0 16px 0; color: #374151; font-size: 14px; line-height: 1.6;">
+                <p class="desc">
                     {job.get('description', 'No description available')}
                 </p>
                 
-                <a href="{job.get('url', '#')}" style="display: inline-block; background: #4F46E5; color: white; text-decoration: none; padding: 12px 24px; border-radius: 8px; font-weight: 500; font-size: 14px; transition: background-color 0.2s;">
+                <a href="{job.get('url', '#')}" style="{APPLY_BUTTON_STYLE}">
                     Apply Now →
                 </a>
             </div>
@@ -63,31 +80,31 @@ class HTMLEmailFormatter:
             if job.get('salary'):
                 employment_info.append(job['salary'])
             
-            employment_badge = f'<span style="background: #EEF2FF; color: #4F46E5; padding: 4px 12px; border-radius: 20px; font-size: 12px; font-weight: 500;">{" | ".join(employment_info)}</span>' if employment_info else ''
+            employment_badge = f'<span class="tag">{" | ".join(employment_info)}</span>' if employment_info else ''
             
             # *** NEW: Add relevance score badge ***
             relevance_score = job.get('relevance_score', 0)
             score_color = self._get_score_color(relevance_score)
-            score_badge = f'<span style="background: {score_color}; color: white; padding: 4px 8px; border-radius: 12px; font-size: 11px; font-weight: 600; margin-left: 8px;">Score: {relevance_score}%</span>'
+            score_badge = f'<span class="score" style="background:{score_color}">Score: {relevance_score}%</span>'
             
             jobs_html += f"""
-            <div style="background: white; border-radius: 12px; padding: 24px; margin-bottom: 20px; box-shadow: 0 2px8px rgba(0,0,0,0.1); border-left: 4px solid #4F46E5;">
-                <div style="display: flex; justify-content: space-between; align-items: flex-start; margin-bottom: 12px;">
-                    <h3 style="margin: 0; color: #1F2937; font-size: 18px; font-weight: 600; line-height: 1.4;">
+            <div class="job">
+                <div class="job-head">
+                    <h3 class="job-title">
                         {job.get('title', 'Job Title Not Available')}
                         {score_badge}
                     </h3>
                     {employment_badge}
                 </div>
                 
-                {f'<p style="margin: 0 0 8px 0; color: #6B7280; font-size: 14px;"><strong>Company:</strong> {job.get("company", "Not specified")}</p>' if job.get('company') else ''}
-                <p style="margin: 0 0 16px 0; color: #6B7280; font-size: 14px;"><strong>Location:</strong> {job.get('location', 'Not specified')}</p>
+                {f'<p class="meta"><strong>Company:</strong> {job.get("company", "Not specified")}</p>' if job.get('company') else ''}
+                <p class="meta-last"><strong>Location:</strong> {job.get('location', 'Not specified')}</p>
                 
-                <p style="margin: 0 0 16px 0; color: #374151; font-size: 14px; line-height: 1.6;">
+                <p class="desc">
                     {job.get('snippet', 'No description available')}
                 </p>
                 
-                <a href="{job.get('url', '#')}" style="display: inline-block; background: #4F46E5; color: white; text-decoration: none; padding: 12px 24px; border-radius: 8px; font-weight: 500; font-size: 14px;">
+                <a href="{job.get('url', '#')}" style="{APPLY_BUTTON_STYLE}">
                     Apply Now →
                 </a>
             </div>
@@ -116,13 +133,14 @@ class HTMLEmailFormatter:
 
     def _get_email_template(self, recipient_name: str, current_date: str, job_count: int, summary: str, jobs_html: str, search_keywords: List[str], search_locations: List[str]) -> str:
         """Base HTML email template with modern design"""
-        return f"""
+        html = f"""
         <!DOCTYPE html>
         <html lang="en">
         <head>
             <meta charset="UTF-8">
             <meta name="viewport" content="width=device-width, initial-scale=1.0">
             <title>Job Alert Digest</title>
+            <style>{JOB_CARD_CSS}</style>
         </head>
         <body style="margin: 0; padding: 0; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif; background-color: #F9FAFB; line-height: 1.6;">
             <div style="max-width: 600px; margin: 0 auto; background-color: #F9FAFB;">
@@ -205,4 +223,42 @@ class HTMLEmailFormatter:
             </div>
         </body>
         </html>
-        """
\ No newline at end of file
+        """
+        return self._compact_html(html)
+
+    def _compact_html(self, html: str) -> str:
+        """Strip template comments, indentation and whitespace between tags"""
+        html = re.sub(r'<!--(?!\[if).*?-->', '', html, flags=re.S)
+        html = re.sub(r'\s+', ' ', html)
+        return re.sub(r'>\s+<', '><', html).strip()
+
+    def create_plaintext_email(self, recipient_name: str, jobs: List[Dict], summary: str, search_keywords: List[str], search_locations: List[str]) -> str:
+        """Plain-text alternative built from the same job data as the HTML digest"""
+        current_date = datetime.now().strftime("%B %d, %Y")
+        lines = [
+            f"Your Job Alert Digest - {current_date}",
+            "",
+            f"Hello {recipient_name}!",
+            "",
+            summary,
+            "",
+            f"Keywords: {', '.join(search_keywords)}",
+            f"Locations: {', '.join(search_locations)}",
+            "",
+            f"Latest Opportunities ({len(jobs)} jobs, sorted by relevance)",
+        ]
+
+        for index, job in enumerate(jobs, 1):
+            lines.append("")
+            lines.append(f"{index}. {job.get('title', 'Job Title Not Available')} (Score: {job.get('relevance_score', 0)}%)")
+            # LLM JSON may carry numbers (e.g. salary), so coerce like the HTML f-strings do
+            details = [str(job.get(field)) for field in ('company', 'location', 'employment_type', 'salary') if job.get(field)]
+            if details:
+                lines.append("   " + " | ".join(details))
+            description = job.get('description') or job.get('snippet')
+            if description:
+                lines.append(f"   {str(description).strip()}")
+            lines.append(f"   Apply: {job.get('url', '#')}")
+
+        lines.extend(["", "--", "Job Alert System - Jobs ranked by relevance"])
+        return "\n".join(lines)
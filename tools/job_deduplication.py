@@ -3,7 +3,9 @@ from typing import Dict, Set
 import hashlib
 import re
 from difflib import SequenceMatcher
-from utils.logger import logger
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 class JobDeduplicator:
     """Handles job deduplication using multiple strategies"""
@@ -45,7 +47,7 @@ class JobDeduplicator:
 
         # Exact match check
         if job_hash in self.seen_jobs:
-            logger.info(f"Exact duplicate found: {job.get('title', 'Unknown')}")
+            logger.debug("Exact duplicate found: %s", job.get('title', 'Unknown'))
             return True
 
         # Similarity check (for fuzzy duplicates)
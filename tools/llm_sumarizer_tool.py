@@ -3,7 +3,9 @@ from crewai.tools import BaseTool
 from typing import List, Dict
 import requests
 import json
-from utils.logger import logger
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 class LLMSummarizerTool(BaseTool):
     name: str = "LLM Summarizer Tool"
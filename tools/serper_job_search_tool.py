@@ -6,19 +6,21 @@ import os
 from typing import List, Dict
 from datetime import datetime
 from dotenv import load_dotenv
-from utils.logger import logger
+from utils.logger import get_logger, LogAggregator
 from .job_deduplication import JobDeduplicator
 from .job_relevance_scorer import JobRelevanceScorer
 
 load_dotenv()
 
+logger = get_logger(__name__)
+
 
 class SerperJobSearchTool(BaseTool):
     name: str = "Serper Job Search Tool"
     description: str = "Searches for job listings using Serper.dev based on keywords and locations."
 
     def _run(self, keywords: List[str], locations: List[str], max_results: int = 10) -> List[Dict]:
-        logger.info(f"Starting job search with SerperJobSearchTool")
+        logger.info("Starting job search with SerperJobSearchTool")
         
         api_key = os.getenv('SERPER_API_KEY')
         if not api_key:
@@ -40,7 +42,8 @@ class SerperJobSearchTool(BaseTool):
             for location in locations:
                 search_count += 1
                 query = f"{keyword} jobs in {location}"
-                logger.info(f"Search {search_count}/{total_searches}: '{query}'")
+                logger.info("Search %d/%d: '%s'", search_count, total_searches, query)
+                query_log = LogAggregator(logger, f"Query '{query}'", query=query)
                 
                 payload = json.dumps({
                     "q": query,
@@ -59,7 +62,7 @@ class SerperJobSearchTool(BaseTool):
                     response_json = json.loads(data.decode("utf-8"))
                     
                     organic_results = response_json.get("organic", [])
-                    logger.info(f"Received {len(organic_results)} results for query: '{query}'")
+                    query_log.count("received", len(organic_results))
                     
                     for result in organic_results:
                         # Enhanced job data extraction
@@ -79,23 +82,28 @@ class SerperJobSearchTool(BaseTool):
                         
                         # *** NEW: Check for duplicates ***
                         if deduplicator.is_duplicate(job):
-                            logger.info(f"Skipping duplicate job: {job.get('title', 'Unknown')}")
+                            logger.debug("Skipping duplicate job: %s", job.get('title', 'Unknown'))
+                            query_log.count("duplicates")
                             continue
                         
                         # *** NEW: Calculate relevance score ***
                         relevance_score = relevance_scorer.calculate_relevance_score(job)
                         job['relevance_score'] = relevance_score
                         
-                        logger.info(f"Job '{job.get('title', 'Unknown')}' - Relevance Score: {relevance_score}")
+                        logger.debug("Job '%s' - Relevance Score: %s", job.get('title', 'Unknown'), relevance_score)
+                        query_log.count("kept")
                         
                         job_results.append(job)
+                    
+                    query_log.flush()
                         
                     if len(job_results) >= max_results:
-                        logger.info(f"Reached maximum results limit ({max_results}), stopping search")
+                        logger.info("Reached maximum results limit (%d), stopping search", max_results)
                         break
                         
                 except Exception as e:
-                    logger.error(f"Error during search for '{query}': {e}")
+                    logger.error("Error during search for '%s': %s", query, e)
+                    query_log.flush()
                     continue
                     
             if len(job_results) >= max_results:
@@ -105,12 +113,12 @@ class SerperJobSearchTool(BaseTool):
         job_results.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
         
         final_results = job_results[:max_results]
-        logger.info(f"Job search completed. Returning {len(final_results)} unique, scored results")
+        logger.info("Job search completed. Returning %d unique, scored results", len(final_results))
         
         # Log relevance score distribution
         if final_results:
             scores = [job.get('relevance_score', 0) for job in final_results]
-            logger.info(f"Relevance scores - Min: {min(scores)}, Max: {max(scores)}, Avg: {sum(scores)/len(scores):.2f}")
+            logger.info("Relevance scores - Min: %s, Max: %s, Avg: %.2f", min(scores), max(scores), sum(scores) / len(scores))
         
         return final_results
 
@@ -0,0 +1,185 @@
+# utils/digest_worker.py
+import json
+import multiprocessing
+import os
+import time
+from datetime import datetime
+from typing import Dict
+from tools.serper_job_search_tool import SerperJobSearchTool
+from tools.email_sender_tool import EmailSenderTool
+from tools.html_email_formatter import HTMLEmailFormatter
+from tools.llm_sumarizer_tool import LLMSummarizerTool
+from utils.job_queue import JobQueue
+from utils.logger import configure_logging, get_logger, shutdown_logging
+
+logger = get_logger(__name__)
+
+
+# Each stage takes a claimed task, whose payload was produced by the previous
+# stage, and returns that payload extended with its own output, so any stage
+# can be retried from the queue alone.
+
+def search_stage(task: Dict, queue: JobQueue) -> Dict:
+    payload = task['payload']
+    profile = payload['profile']
+    serper_tool = SerperJobSearchTool()
+    job_results = serper_tool._run(profile['keywords'], profile['locations'], profile['max_results'])
+    logger.info("[%s] Job search completed. Found %d job listings", profile['name'], len(job_results),
+                extra={'profile': profile['name']})
+    return {**payload, 'job_results': job_results}
+
+
+def summarize_stage(task: Dict, queue: JobQueue) -> Dict:
+    payload = task['payload']
+    profile = payload['profile']
+    prompts = payload['prompts']
+    llm_summarizer = LLMSummarizerTool()
+    summary = llm_summarizer._run(payload['job_results'], prompts['system_message'], prompts['prompt_intro'])
+    logger.info("[%s] LLM summarization completed", profile['name'], extra={'profile': profile['name']})
+    return {**payload, 'summary': summary}
+
+
+def render_stage(task: Dict, queue: JobQueue) -> Dict:
+    payload = task['payload']
+    profile = payload['profile']
+    job_results = payload['job_results']
+    html_formatter = HTMLEmailFormatter()
+
+    # Try to parse LLM's JSON response, fallback to simple formatting
+    try:
+        parsed_summary = json.loads(payload['summary'])
+        html_email = html_formatter.create_enhanced_email(
+            recipient_name=profile['recipient_name'],
+            job_data=parsed_summary,
+            search_keywords=profile['keywords'],
+            search_locations=profile['locations']
+        )
+        digest_jobs = parsed_summary.get('jobs', [])
+        digest_summary = parsed_summary.get('summary', 'New job opportunities found for your search criteria.')
+    except (json.JSONDecodeError, KeyError, AttributeError):
+        logger.warning("[%s] Could not parse LLM JSON response, using fallback formatting", profile['name'],
+                       extra={'profile': profile['name']})
+        html_email = html_formatter.create_simple_email(
+            recipient_name=profile['recipient_name'],
+            job_results=job_results,
+            search_keywords=profile['keywords'],
+            search_locations=profile['locations']
+        )
+        digest_jobs = job_results
+        digest_summary = "We found new job opportunities matching your search criteria."
+
+    # The plaintext part is optional; send_email falls back to a placeholder without it
+    try:
+        text_email = html_formatter.create_plaintext_email(
+            recipient_name=profile['recipient_name'],
+            jobs=digest_jobs,
+            summary=digest_summary,
+            search_keywords=profile['keywords'],
+            search_locations=profile['locations']
+        )
+    except Exception as e:
+        logger.warning("[%s] Could not build plaintext part, using placeholder: %s", profile['name'], e,
+                       extra={'profile': profile['name']})
+        text_email = None
+
+    current_date = datetime.now().strftime("%B %d, %Y")
+    subject = f"🚀 Your Job Alert Digest - {len(job_results)} New Opportunities | {current_date}"
+    return {**payload, 'subject': subject, 'html_email': html_email, 'text_email': text_email}
+
+
+def send_stage(task: Dict, queue: JobQueue) -> Dict:
+    payload = task['payload']
+    profile = payload['profile']
+
+    # SMTP has no idempotency key, so a retry after a successful send must not send again
+    if task.get('sent_at'):
+        logger.info("[%s] Email already sent by an earlier attempt, skipping", profile['name'],
+                    extra={'profile': profile['name']})
+        return {'profile': profile, 'result': 'already sent'}
+
+    email_tool = EmailSenderTool()
+    result = email_tool.send_email(payload['subject'], payload['html_email'], profile.get('recipient_email'),
+                                   payload.get('text_email'))
+    queue.mark_sent(task)
+    logger.info("[%s] Email sending result: %s", profile['name'], result, extra={'profile': profile['name']})
+    return {'profile': profile, 'result': result}
+
+
+STAGE_HANDLERS = {
+    'search': search_stage,
+    'summarize': summarize_stage,
+    'render': render_stage,
+    'send': send_stage,
+}
+
+
+def worker_loop(run_id: str, queue_settings: Dict):
+    """Claim and run tasks until the run has nothing left to do"""
+    worker_name = f"worker-{os.getpid()}"
+    queue = JobQueue(
+        queue_settings['db_path'],
+        max_attempts=queue_settings['max_attempts'],
+        lease_seconds=queue_settings['lease_seconds'],
+        retry_backoff=queue_settings['retry_backoff']
+    )
+    logger.info("%s started", worker_name)
+
+    try:
+        while True:
+            task = queue.claim(run_id)
+            if task is None:
+                if not queue.has_unfinished(run_id):
+                    break
+                # Other workers still hold tasks or retries are backing off
+                time.sleep(queue_settings['poll_interval'])
+                continue
+
+            task_fields = {'profile': task['profile'], 'stage': task['stage'], 'attempt': task['attempts']}
+            logger.info("%s running %s/%s (attempt %d)", worker_name, task['profile'], task['stage'],
+                        task['attempts'], extra=task_fields)
+            try:
+                result = STAGE_HANDLERS[task['stage']](task, queue)
+            except Exception as e:
+                status = queue.fail(task, str(e))
+                if status is None:
+                    logger.warning("%s %s/%s failed after its lease was taken over, ignoring: %s", worker_name,
+                                   task['profile'], task['stage'], e, extra=task_fields)
+                elif status == 'pending':
+                    logger.warning("%s %s/%s failed, will retry: %s", worker_name, task['profile'], task['stage'], e,
+                                   extra=task_fields)
+                else:
+                    logger.error("%s %s/%s failed after %d attempts: %s", worker_name, task['profile'], task['stage'],
+                                 task['attempts'], e, extra=task_fields)
+                continue
+
+            if not queue.complete(task, result):
+                logger.warning("%s %s/%s finished after its lease was taken over, discarding result", worker_name,
+                               task['profile'], task['stage'], extra=task_fields)
+    finally:
+        queue.close()
+        logger.info("%s finished", worker_name)
+
+
+def _worker_process(run_id: str, queue_settings: Dict, logging_settings: Dict):
+    """Entry point of a worker process, which needs its own logging listener"""
+    configure_logging(**logging_settings)
+    try:
+        worker_loop(run_id, queue_settings)
+    finally:
+        shutdown_logging()
+
+
+def run_workers(run_id: str, queue_settings: Dict, logging_settings: Dict, num_workers: int):
+    """Drain a run with a pool of worker processes"""
+    if num_workers <= 1:
+        worker_loop(run_id, queue_settings)
+        return
+
+    processes = [
+        multiprocessing.Process(target=_worker_process, args=(run_id, queue_settings, logging_settings))
+        for _ in range(num_workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
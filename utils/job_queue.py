@@ -0,0 +1,255 @@
+# utils/job_queue.py
+import json
+import os
+import socket
+import sqlite3
+import time
+from typing import Dict, List, Optional
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Digest stages, in the order each profile moves through them
+STAGES = ["search", "summarize", "render", "send"]
+
+# Columns added after the first release; created on open for older databases
+_EXTRA_COLUMNS = {
+    "owner_host": "TEXT",
+    "owner_pid": "INTEGER",
+    "sent_at": "REAL",
+}
+
+
+class JobQueue:
+    """Durable SQLite-backed task queue for per-profile digest stages.
+
+    Each task is keyed by (run_id, profile, stage), so enqueueing the same
+    work twice is a no-op and a finished stage is never repeated. Tasks
+    claimed by a worker hold a lease; if the worker dies, the lease expires
+    and another worker picks the task up again. A claim is identified by its
+    attempt number, so a worker whose lease was taken over cannot complete
+    or fail the task afterwards.
+    """
+
+    def __init__(self, db_path: str, max_attempts: int = 3, lease_seconds: int = 900, retry_backoff: float = 30.0):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.retry_backoff = retry_backoff
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        # Autocommit mode so transactions are controlled explicitly below
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id TEXT NOT NULL,
+                profile TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                payload TEXT NOT NULL,
+                error TEXT,
+                available_at REAL NOT NULL,
+                lease_expires_at REAL,
+                updated_at REAL NOT NULL,
+                UNIQUE (run_id, profile, stage)
+            )
+            """
+        )
+        existing = {row["name"] for row in self.conn.execute("PRAGMA table_info(tasks)")}
+        for column, column_type in _EXTRA_COLUMNS.items():
+            if column not in existing:
+                self.conn.execute(f"ALTER TABLE tasks ADD COLUMN {column} {column_type}")
+
+    def close(self):
+        self.conn.close()
+
+    def enqueue(self, run_id: str, profile: str, stage: str, payload: Dict) -> bool:
+        """Add a task unless it already exists. Returns True if it was inserted"""
+        now = time.time()
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO tasks (run_id, profile, stage, payload, available_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (run_id, profile, stage, json.dumps(payload), now, now)
+        )
+        return cursor.rowcount == 1
+
+    def claim(self, run_id: str) -> Optional[Dict]:
+        """Atomically take the next runnable task of a run, including ones whose lease expired"""
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            # A task whose worker keeps dying never reaches fail(), so give up on it here
+            self.conn.execute(
+                "UPDATE tasks SET status = 'failed', lease_expires_at = NULL, updated_at = ?, "
+                "error = 'Worker lost the task (lease expired) on its last attempt' "
+                "WHERE run_id = ? AND status = 'running' AND lease_expires_at < ? AND attempts >= ?",
+                (now, run_id, now, self.max_attempts)
+            )
+            row = self.conn.execute(
+                "SELECT * FROM tasks WHERE run_id = ? "
+                "AND ((status = 'pending' AND available_at <= ?) "
+                "     OR (status = 'running' AND lease_expires_at < ?)) "
+                "ORDER BY id LIMIT 1",
+                (run_id, now, now)
+            ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+
+            self.conn.execute(
+                "UPDATE tasks SET status = 'running', attempts = attempts + 1, "
+                "lease_expires_at = ?, owner_host = ?, owner_pid = ?, updated_at = ? WHERE id = ?",
+                (now + self.lease_seconds, socket.gethostname(), os.getpid(), now, row["id"])
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+        task = dict(row)
+        task["attempts"] += 1
+        task["payload"] = json.loads(task["payload"])
+        return task
+
+    def complete(self, task: Dict, result: Dict) -> bool:
+        """Mark a task done and enqueue the profile's next stage in the same transaction.
+
+        Returns False, changing nothing, if the task was meanwhile claimed by another worker.
+        """
+        now = time.time()
+        stage_index = STAGES.index(task["stage"])
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = self.conn.execute(
+                "UPDATE tasks SET status = 'done', error = NULL, lease_expires_at = NULL, updated_at = ? "
+                "WHERE id = ? AND status = 'running' AND attempts = ?",
+                (now, task["id"], task["attempts"])
+            )
+            if cursor.rowcount == 0:
+                self.conn.execute("ROLLBACK")
+                return False
+            if stage_index + 1 < len(STAGES):
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO tasks (run_id, profile, stage, payload, available_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (task["run_id"], task["profile"], STAGES[stage_index + 1], json.dumps(result), now, now)
+                )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return True
+
+    def fail(self, task: Dict, error: str) -> Optional[str]:
+        """Record a failed attempt.
+
+        Returns the task's new status ('pending' if it will be retried, 'failed'
+        otherwise), or None if the task was meanwhile claimed by another worker.
+        """
+        now = time.time()
+        if task["attempts"] < self.max_attempts:
+            # Linear backoff so transient API/SMTP errors have time to clear
+            status = "pending"
+            available_at = now + self.retry_backoff * task["attempts"]
+        else:
+            status = "failed"
+            available_at = now
+        cursor = self.conn.execute(
+            "UPDATE tasks SET status = ?, error = ?, available_at = ?, lease_expires_at = NULL, updated_at = ? "
+            "WHERE id = ? AND status = 'running' AND attempts = ?",
+            (status, error, available_at, now, task["id"], task["attempts"])
+        )
+        return status if cursor.rowcount else None
+
+    def mark_sent(self, task: Dict):
+        """Record that a send task's email went out, before anything else can fail.
+
+        Written unconditionally by id: the email has been delivered even if
+        this worker's lease was meanwhile taken over.
+        """
+        self.conn.execute(
+            "UPDATE tasks SET sent_at = ?, updated_at = ? WHERE id = ?",
+            (time.time(), time.time(), task["id"])
+        )
+
+    def release_stale(self, run_id: str) -> int:
+        """Return tasks left 'running' by a crashed process to the pending state.
+
+        Only tasks whose owning process is known to be gone are released, so an
+        overlapping run leaves another run's in-flight stages alone. Tasks owned
+        by other hosts are left to expire through their lease.
+        """
+        rows = self.conn.execute(
+            "SELECT id, attempts, owner_pid FROM tasks "
+            "WHERE run_id = ? AND status = 'running' AND owner_host = ?",
+            (run_id, socket.gethostname())
+        ).fetchall()
+
+        released = 0
+        for row in rows:
+            if row["owner_pid"] is not None and _process_alive(row["owner_pid"]):
+                continue
+            cursor = self.conn.execute(
+                "UPDATE tasks SET status = 'pending', lease_expires_at = NULL, available_at = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'running' AND attempts = ?",
+                (time.time(), time.time(), row["id"], row["attempts"])
+            )
+            released += cursor.rowcount
+        if released:
+            logger.info(f"Released {released} interrupted task(s) from a previous run")
+        return released
+
+    def requeue_failed(self, run_id: str) -> int:
+        """Give tasks that exhausted their retries a fresh set of attempts"""
+        cursor = self.conn.execute(
+            "UPDATE tasks SET status = 'pending', attempts = 0, available_at = ?, updated_at = ? "
+            "WHERE run_id = ? AND status = 'failed'",
+            (time.time(), time.time(), run_id)
+        )
+        if cursor.rowcount:
+            logger.info(f"Requeued {cursor.rowcount} failed task(s) from a previous attempt")
+        return cursor.rowcount
+
+    def has_unfinished(self, run_id: str) -> bool:
+        """Check whether any task of a run is still pending or running"""
+        row = self.conn.execute(
+            "SELECT 1 FROM tasks WHERE run_id = ? AND status IN ('pending', 'running') LIMIT 1",
+            (run_id,)
+        ).fetchone()
+        return row is not None
+
+    def counts(self, run_id: str) -> Dict[str, int]:
+        """Number of tasks per status for a run"""
+        rows = self.conn.execute(
+            "SELECT status, COUNT(*) AS n FROM tasks WHERE run_id = ? GROUP BY status",
+            (run_id,)
+        ).fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def failed_tasks(self, run_id: str) -> List[Dict]:
+        """Tasks that exhausted their retries"""
+        rows = self.conn.execute(
+            "SELECT profile, stage, attempts, error FROM tasks WHERE run_id = ? AND status = 'failed' ORDER BY id",
+            (run_id,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+
+def _process_alive(pid: int) -> bool:
+    """Check whether a process with this pid exists on this host"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, but belongs to another user
+        return True
+    return True
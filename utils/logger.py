@@ -1,10 +1,150 @@
 #utils/logger.py
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import os
+import queue
+from collections import Counter
+from typing import Dict, Optional
+
+TEXT_FORMAT = "[%(asctime)s] %(levelname)s - %(message)s"
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, including `extra` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = record.stack_info
+        return json.dumps(entry, default=str)
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps tracebacks out of the message.
+
+    The stock prepare() folds the traceback into `msg`. This one only
+    interpolates the message and stores the traceback text in `exc_text`,
+    so the listener's formatter decides where it goes.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _TRACEBACK_FORMATTER.formatException(record.exc_info)
+            # Traceback objects hold frames; only the text crosses the queue
+            record.exc_info = None
+        return record
+
+
+_TRACEBACK_FORMATTER = logging.Formatter()
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="[%(asctime)s] %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler()]
-)
 
 logger = logging.getLogger("JobAlert")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_pid: Optional[int] = None
+
+
+def configure_logging(level: str = "INFO", fmt: str = "text", levels: Optional[Dict[str, str]] = None):
+    """(Re)configure logging so console output happens on a background thread.
+
+    The calling thread only interpolates the message of enabled records and
+    enqueues it; the final text/JSON formatting and the console write run on
+    the listener thread. `levels` maps module names (e.g.
+    "tools.serper_job_search_tool") to their own level. Call again in each
+    worker process, since the listener thread does not survive a fork, and
+    call shutdown_logging() before the process exits.
+    """
+    global _listener, _listener_pid
+
+    # A listener inherited through fork has no thread in this process
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+    _listener = None
+
+    stream_handler = logging.StreamHandler()
+    if fmt == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(StructuredQueueHandler(log_queue))
+    root.setLevel(level.upper())
+
+    for name, module_level in (levels or {}).items():
+        get_logger(name).setLevel(module_level.upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    _listener_pid = os.getpid()
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Module logger under the JobAlert hierarchy, so its level can be set on its own"""
+    return logger.getChild(name)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread.
+
+    Runs at interpreter exit, but multiprocessing children exit without
+    atexit hooks, so worker processes must call this themselves.
+    """
+    global _listener
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+    _listener = None
+
+
+class LogAggregator:
+    """Counts per-item events and logs them as a single summary line.
+
+    Use instead of logging every posting in a loop; the individual events
+    can still be logged at DEBUG with lazy %-style arguments.
+    """
+
+    def __init__(self, log: logging.Logger, label: str, **context):
+        self.log = log
+        self.label = label
+        self.context = context
+        self.counts = Counter()
+
+    def count(self, event: str, n: int = 1):
+        self.counts[event] += n
+
+    def flush(self, level: int = logging.INFO):
+        if not self.log.isEnabledFor(level):
+            return
+        summary = ", ".join(f"{event}={n}" for event, n in self.counts.items()) or "no events"
+        self.log.log(level, "%s: %s", self.label, summary, extra={**self.context, "counts": dict(self.counts)})
+        self.counts.clear()
+
+
+configure_logging()
+atexit.register(shutdown_logging)